@@ -2,41 +2,62 @@ from zipfile import ZipFile
 from io import BytesIO
 from PIL import Image
 import imagehash
+import numpy as np
 
 
-def extract_primary_icon(apk_path: str, icon_path_hint: str | None = None):
-    with ZipFile(apk_path, 'r') as z:
-        names = z.namelist()
-        if icon_path_hint and icon_path_hint in names:
-            data = z.read(icon_path_hint)
-            return data, Image.open(BytesIO(data))
-        # fallback pick largest png/webp under res/mipmap*/drawable*
-        candidates = []
-        for n in names:
-            nl = n.lower()
-            if nl.startswith('res/') and (nl.endswith('.png') or nl.endswith('.webp')) and ('mipmap' in nl or 'drawable' in nl):
-                try:
-                    data = z.read(n)
-                    img = Image.open(BytesIO(data))
-                    candidates.append((n, img.size[0]*img.size[1], data, img))
-                except Exception:
-                    continue
-        if not candidates:
-            return None, None
-        candidates.sort(key=lambda x: x[1], reverse=True)
-        _, _, data, img = candidates[0]
-        return data, img
+def extract_primary_icon(z: ZipFile, icon_path_hint: str | None = None):
+    names = z.namelist()
+    if icon_path_hint and icon_path_hint in names:
+        data = z.read(icon_path_hint)
+        return data, Image.open(BytesIO(data))
+    # fallback pick largest png/webp under res/mipmap*/drawable*
+    # Probe candidate dimensions from the image header only (Image.open is
+    # lazy); full read+decode happens just for the winner.
+    best_name, best_area = None, -1
+    for n in names:
+        nl = n.lower()
+        if nl.startswith('res/') and (nl.endswith('.png') or nl.endswith('.webp')) and ('mipmap' in nl or 'drawable' in nl):
+            try:
+                with z.open(n) as fh, Image.open(fh) as probe:
+                    area = probe.size[0] * probe.size[1]
+            except Exception:
+                continue
+            if area > best_area:
+                best_name, best_area = n, area
+    if best_name is None:
+        return None, None
+    data = z.read(best_name)
+    return data, Image.open(BytesIO(data))
 
 
 def icon_phash(img: Image.Image) -> str:
+    # pHash only looks at a 32x32 grayscale plane; reduce to that here so
+    # draft-capable decoders skip the full RGB decode and imagehash's own
+    # convert/resize become no-ops.
+    img.draft('L', (32, 32))
+    img = img.convert('L').resize((32, 32), Image.LANCZOS)
     return str(imagehash.phash(img))
 
 
 def similarity_score(hash1: str, hash2: str) -> float:
     if not hash1 or not hash2:
         return 0.0
-    h1 = imagehash.hex_to_hash(hash1)
-    h2 = imagehash.hex_to_hash(hash2)
-    max_bits = h1.hash.size
-    dist = (h1 - h2)
-    return 1.0 - (dist / max_bits)
\ No newline at end of file
+    max_bits = len(hash1) * 4
+    dist = (int(hash1, 16) ^ int(hash2, 16)).bit_count()
+    return 1.0 - (dist / max_bits)
+
+
+def best_similarity_score(hash1: str, hashes) -> float:
+    # `hashes` is ideally a precomputed np.uint64 array (see
+    # _load_trusted_data); hex strings are converted as a fallback.
+    if not hash1 or hashes is None or len(hashes) == 0:
+        return 0.0
+    ref = np.uint64(int(hash1, 16))
+    if isinstance(hashes, np.ndarray):
+        arr = hashes
+    else:
+        arr = np.array([int(h, 16) for h in hashes], dtype=np.uint64)
+    xored = (arr ^ ref).view(np.uint8)
+    dists = np.unpackbits(xored).reshape(len(arr), -1).sum(axis=1)
+    max_bits = len(hash1) * 4
+    return float(1.0 - (dists.min() / max_bits))
\ No newline at end of file
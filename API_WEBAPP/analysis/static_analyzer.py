@@ -1,9 +1,13 @@
 import json
 import os
+import re
 from dataclasses import dataclass, asdict
-from zipfile import ZipFile
+from functools import lru_cache
+
+import numpy as np
+from zipfile import ZipFile, BadZipFile
 from .utils import sha256_file, shannon_entropy, extract_zip_entry_bytes, extract_all_strings, count_suspicious_strings
-from .icon_utils import extract_primary_icon, icon_phash, similarity_score
+from .icon_utils import extract_primary_icon, icon_phash, best_similarity_score
 from .vt_lookup import vt_lookup_sha256
 
 # Lazy/optional heavy deps
@@ -42,6 +46,8 @@ class AnalysisResult:
         return asdict(self)
 
 
+_CERT_ENTRY_RE = re.compile(r'^META-INF/.+\.(RSA|DSA|EC)$', re.IGNORECASE)
+
 DANGEROUS_PERMS = {
     'android.permission.READ_SMS', 'android.permission.RECEIVE_SMS', 'android.permission.SEND_SMS',
     'android.permission.READ_CONTACTS', 'android.permission.WRITE_CONTACTS',
@@ -52,11 +58,26 @@ DANGEROUS_PERMS = {
 }
 
 
+@lru_cache(maxsize=8)
+def _parse_trusted_data(json_path: str, mtime: float | None) -> dict:
+    # mtime keys the cache so edits to the trust list are picked up
+    # without a restart; mtime=None means the file is missing.
+    if mtime is None:
+        data = {"trusted_certs": [], "trusted_icons": [], "bank_packages": []}
+    else:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    data['trusted_certs_lower'] = frozenset(c.lower() for c in data.get('trusted_certs', []))
+    data['trusted_icons'] = tuple(data.get('trusted_icons', []))
+    data['trusted_icons_u64'] = np.array(
+        [int(h, 16) for h in data['trusted_icons']], dtype=np.uint64
+    )
+    return data
+
+
 def _load_trusted_data(json_path: str) -> dict:
-    if not os.path.exists(json_path):
-        return {"trusted_certs": [], "trusted_icons": [], "bank_packages": []}
-    with open(json_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    mtime = os.path.getmtime(json_path) if os.path.exists(json_path) else None
+    return _parse_trusted_data(json_path, mtime)
 
 
 def _extract_manifest_with_androguard(apk_path: str):
@@ -119,8 +140,7 @@ def _extract_manifest_with_apkutils(apk_path: str):
             import hashlib
             with ZipFile(apk_path, 'r') as z:
                 for n in z.namelist():
-                    u = n.upper()
-                    if u.startswith('META-INF/') and (u.endswith('.RSA') or u.endswith('.DSA') or u.endswith('.EC')):
+                    if _CERT_ENTRY_RE.match(n):
                         fp = hashlib.sha256(z.read(n)).hexdigest()
                         break
         except Exception:
@@ -134,7 +154,8 @@ def _extract_manifest_with_apkutils(apk_path: str):
         return None
 
 
-def analyze_apk(apk_path: str, trusted_data_path: str, vt_enabled: bool = False) -> AnalysisResult:
+def analyze_apk(apk_path: str, trusted_data_path: str, vt_enabled: bool = False,
+                sha256: str | None = None) -> AnalysisResult:
     meta = _extract_manifest_with_androguard(apk_path) or _extract_manifest_with_apkutils(apk_path) or {}
 
     pkg = meta.get('package')
@@ -145,32 +166,35 @@ def analyze_apk(apk_path: str, trusted_data_path: str, vt_enabled: bool = False)
 
     dangerous = sorted(set(perms).intersection(DANGEROUS_PERMS))
 
-    classes = extract_zip_entry_bytes(apk_path, 'classes.dex')
-    entropy = shannon_entropy(classes) if classes else 0.0
+    # Open the archive once; every zip-reading step below shares the handle.
+    classes = None
+    strings = []
+    icon_img = None
+    try:
+        with ZipFile(apk_path, 'r') as zf:
+            classes = extract_zip_entry_bytes(zf, 'classes.dex')
+            strings = extract_all_strings(classes) if classes else []
+            if not strings:
+                manifest_bytes = extract_zip_entry_bytes(zf, 'AndroidManifest.xml') or b''
+                strings = extract_all_strings(manifest_bytes)
+            icon_bytes, icon_img = extract_primary_icon(zf, meta.get('icon_hint'))
+    except BadZipFile:
+        pass
 
-    strings = extract_all_strings(classes) if classes else []
-    if not strings:
-        manifest_bytes = extract_zip_entry_bytes(apk_path, 'AndroidManifest.xml') or b''
-        strings = extract_all_strings(manifest_bytes)
+    entropy = shannon_entropy(classes) if classes else 0.0
     suspicious = count_suspicious_strings(strings)
-
-    icon_hint = meta.get('icon_hint')
-    icon_bytes, icon_img = extract_primary_icon(apk_path, icon_hint)
     icon_hash = icon_phash(icon_img) if icon_img else None
 
-    sha256 = sha256_file(apk_path)
+    if sha256 is None:
+        sha256 = sha256_file(apk_path)
 
     vt = vt_lookup_sha256(sha256) if vt_enabled else {"detections": 0, "total": 0}
 
     trusted = _load_trusted_data(trusted_data_path)
     cert_fp = meta.get('cert_fingerprint')
-    trusted_certs = {c.lower() for c in trusted.get('trusted_certs', [])}
-    cert_match = (cert_fp and cert_fp.lower() in trusted_certs) or False
+    cert_match = (cert_fp and cert_fp.lower() in trusted['trusted_certs_lower']) or False
 
-    icon_sim = 0.0
-    if icon_hash:
-        for h in trusted.get('trusted_icons', []):
-            icon_sim = max(icon_sim, similarity_score(icon_hash, h))
+    icon_sim = best_similarity_score(icon_hash, trusted['trusted_icons_u64']) if icon_hash else 0.0
 
     return AnalysisResult(
         sha256=sha256,
@@ -1,7 +1,8 @@
-import math
 import re
 import hashlib
-from zipfile import ZipFile, BadZipFile
+from zipfile import ZipFile
+
+import numpy as np
 
 URL_REGEX = re.compile(r"https?://[\w\-\.]+(:\d+)?(/[\w\-\./?%&=+#]*)?", re.IGNORECASE)
 IP_REGEX = re.compile(
@@ -9,59 +10,7 @@ IP_REGEX = re.compile(
     r"(25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)\b"
 )
 
-
-def sha256_file(path: str) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
-def shannon_entropy(data: bytes) -> float:
-    if not data:
-        return 0.0
-    freq = [0] * 256
-    for b in data:
-        freq[b] += 1
-    entropy = 0.0
-    length = len(data)
-    for c in freq:
-        if c:
-            p = c / length
-            entropy -= p * math.log2(p)
-    return entropy
-
-
-def extract_zip_entry_bytes(apk_path: str, name_contains: str):
-    try:
-        with ZipFile(apk_path, 'r') as z:
-            for n in z.namelist():
-                if name_contains.lower() in n.lower():
-                    return z.read(n)
-    except BadZipFile:
-        return None
-    return None
-
-
-def extract_all_strings(data: bytes, min_len: int = 5):
-    out, acc = [], []
-    for b in data or b"":
-        if 32 <= b <= 126:
-            acc.append(chr(b))
-        else:
-            if len(acc) >= min_len:
-                out.append(''.join(acc))
-            acc = []
-    if len(acc) >= min_len:
-        out.append(''.join(acc))
-    return out
-
-
-def count_suspicious_strings(strings):
-    urls = [s for s in strings if URL_REGEX.search(s)]
-    ips = [s for s in strings if IP_REGEX.search(s)]
-    keywords = [
+SUSPICIOUS_KEYWORDS = [
     "login","signin","signup","user","username","userid",
     "password","passwd","pwd","passcode","pin","mpin","credential","creds",
     "otp","totp","mfa","2fa","auth","authenticate","token","sessionid",
@@ -88,7 +37,131 @@ def count_suspicious_strings(strings):
     "ssn","dob","pan","aadhar","aadhaar","passport","drivinglicense",
     "insurance","medical","policy","tax","irs","income","salary","payroll"
 ]
-    kw_hits = sum(any(k in s.lower() for k in keywords) for s in strings)
+
+# Optional Aho-Corasick automaton: one DFA pass per string instead of
+# one substring search per keyword.
+try:
+    import ahocorasick
+
+    _KEYWORD_AC = ahocorasick.Automaton()
+    for _kw in SUSPICIOUS_KEYWORDS:
+        _KEYWORD_AC.add_word(_kw, _kw)
+    _KEYWORD_AC.make_automaton()
+except ImportError:
+    _KEYWORD_AC = None
+
+
+def _has_suspicious_keyword(lowered: str) -> bool:
+    if _KEYWORD_AC is not None:
+        return next(_KEYWORD_AC.iter(lowered), None) is not None
+    return any(k in lowered for k in SUSPICIOUS_KEYWORDS)
+
+
+# Optional Numba backend: single-pass compiled kernels that avoid the
+# temporary arrays of the NumPy paths below. Compiled once and disk-cached.
+try:
+    from numba import njit
+
+    @njit(cache=True)
+    def _entropy_u8(arr):
+        counts = np.zeros(256, dtype=np.int64)
+        for i in range(arr.size):
+            counts[arr[i]] += 1
+        entropy = 0.0
+        for c in counts:
+            if c:
+                p = c / arr.size
+                entropy -= p * np.log2(p)
+        return entropy
+
+    @njit(cache=True)
+    def _printable_runs(arr, min_len):
+        starts = np.empty(arr.size, dtype=np.int64)
+        ends = np.empty(arr.size, dtype=np.int64)
+        k = 0
+        run_start = -1
+        for i in range(arr.size):
+            if 32 <= arr[i] <= 126:
+                if run_start < 0:
+                    run_start = i
+            elif run_start >= 0:
+                if i - run_start >= min_len:
+                    starts[k] = run_start
+                    ends[k] = i
+                    k += 1
+                run_start = -1
+        if run_start >= 0 and arr.size - run_start >= min_len:
+            starts[k] = run_start
+            ends[k] = arr.size
+            k += 1
+        return starts[:k], ends[:k]
+except ImportError:
+    _entropy_u8 = None
+    _printable_runs = None
+
+
+def sha256_file(path: str) -> str:
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+: whole digest runs in C
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+def shannon_entropy(data: bytes) -> float:
+    if not data:
+        return 0.0
+    arr = np.frombuffer(data, dtype=np.uint8)
+    if _entropy_u8 is not None:
+        return float(_entropy_u8(arr))
+    counts = np.bincount(arr, minlength=256).astype(np.float64)
+    nonzero = counts[counts > 0]
+    p = nonzero / arr.size
+    return float(-(p * np.log2(p)).sum())
+
+
+def extract_zip_entry_bytes(zf: ZipFile, name_contains: str):
+    # Exact root-level entry ('classes.dex', 'AndroidManifest.xml') is the
+    # common case and an O(1) lookup in the archive's name index.
+    if name_contains in zf.NameToInfo:
+        return zf.read(name_contains)
+    needle = name_contains.lower()
+    for n in zf.namelist():
+        if needle in n.lower():
+            return zf.read(n)
+    return None
+
+
+def extract_all_strings(data: bytes, min_len: int = 5):
+    if not data:
+        return []
+    arr = np.frombuffer(data, dtype=np.uint8)
+    if _printable_runs is not None:
+        starts, ends = _printable_runs(arr, min_len)
+    else:
+        printable = (arr >= 32) & (arr <= 126)
+        edges = np.diff(np.concatenate(([0], printable.view(np.int8), [0])))
+        run_starts = np.where(edges == 1)[0]
+        run_ends = np.where(edges == -1)[0]
+        keep = (run_ends - run_starts) >= min_len
+        starts, ends = run_starts[keep], run_ends[keep]
+    return [
+        arr[s:e].tobytes().decode('ascii')
+        for s, e in zip(starts, ends)
+    ]
+
+
+def count_suspicious_strings(strings):
+    urls, ips, kw_hits = [], [], 0
+    for s in strings:
+        if URL_REGEX.search(s):
+            urls.append(s)
+        if IP_REGEX.search(s):
+            ips.append(s)
+        if _has_suspicious_keyword(s.lower()):
+            kw_hits += 1
     # return {"url_count": len(urls), "ip_count": len(ips), "keyword_hits": int(kw_hits)}
     return {
         "urls": urls,
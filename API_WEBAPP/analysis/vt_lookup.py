@@ -1,12 +1,35 @@
+import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict
-VT_API_KEY = "a6ee8c2946fe3bdd5aa9bef1f807a49daf393852742e554dbea6917682af9b5e"
+VT_API_KEY = os.environ.get("VT_API_KEY", "")
 VT_BASE_URL = "https://www.virustotal.com/api/v3/files/"
 HEADERS = {"x-apikey": VT_API_KEY}
+
+# Shared session: keeps TLS connections alive across lookups and retries
+# transient upstream errors instead of failing the analysis.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "POST"),
+    ),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+
 def vt_lookup_sha256(sha256: str) -> Dict[str, int]:
+    if not VT_API_KEY:
+        return {"detections": 0, "total": 0}
     url = VT_BASE_URL + sha256
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = SESSION.get(url, headers=HEADERS, timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             stats = data.get("data", {}).get("attributes", {}).get("last_analysis_stats", {})
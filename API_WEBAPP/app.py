@@ -1,16 +1,18 @@
 
 
 
+import hashlib
 import os
 import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from flask import Flask, request, jsonify
 from werkzeug.utils import secure_filename
 from analysis.static_analyzer import analyze_apk
 import joblib
-import pandas as pd
+import numpy as np
 import shap
-import requests
-from analysis.vt_lookup import vt_lookup_sha256  # production VT integration
+from analysis.vt_lookup import vt_lookup_sha256, SESSION as http_session  # production VT integration
 from flask import render_template
 
 # ------------------------
@@ -20,7 +22,8 @@ UPLOAD_FOLDER = tempfile.gettempdir()
 ALLOWED_EXTENSIONS = {'apk'}
 MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50 MB
 MODEL_FILE = 'datamodel.pkl'
-TRUSTED_DATA_FILE = 'trusted_bank_data.json' 
+TRUSTED_DATA_FILE = 'trusted_bank_data.json'
+MB_API_KEY = os.environ.get('MB_API_KEY', '')
 
 # ------------------------
 # Load ML model
@@ -38,16 +41,31 @@ app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 
+# Pool for external reputation lookups so they overlap static analysis
+lookup_pool = ThreadPoolExecutor(max_workers=4)
+
+# Static analysis is pure CPU (entropy, string scan, image decode); run it
+# in worker processes so it doesn't hold the GIL under concurrent requests.
+analysis_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 2)
+
+# LRU of ML results keyed by (APK SHA-256, trusted-data mtime); re-uploads
+# of the same file skip the scaler/model/SHAP work, and edits to the trust
+# list (which feeds model features) invalidate prior entries.
+ML_CACHE_MAX = 256
+ml_cache = OrderedDict()
+
 # ------------------------
 # Helpers
 # ------------------------
 
 def malwarebazaar_lookup_sha256(sha256, api_key=None):
+    if not api_key:
+        return {"detections": 0, "raw": {}}
     url = "https://mb-api.abuse.ch/api/v1/"
     data = {"query": "get_info", "hash": sha256}
-    headers = {"API-Key": api_key} if api_key else {}
+    headers = {"API-Key": api_key}
     try:
-        resp = requests.post(url, data=data, headers=headers, timeout=15)
+        resp = http_session.post(url, data=data, headers=headers, timeout=15)
         if resp.status_code == 200:
             json_data = resp.json()
             detections = len(json_data.get("data", [])) if "data" in json_data else 0
@@ -61,6 +79,57 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def save_and_hash(file_storage, dest_path):
+    """Stream the upload to disk while folding it into SHA-256, so the
+    file is only read once instead of saved and then re-read to hash."""
+    h = hashlib.sha256()
+    with open(dest_path, 'wb') as out:
+        while True:
+            chunk = file_storage.stream.read(1024 * 1024)
+            if not chunk:
+                break
+            h.update(chunk)
+            out.write(chunk)
+    return h.hexdigest()
+
+
+
+def run_ml(static_result):
+    feature_values = {
+        'permissions_score': len(static_result.permissions),
+        'entropy': static_result.entropy_classes_dex,
+        'cert_mismatch': 0 if static_result.cert_trusted_match else 1,
+        'suspicious_strings': len(static_result.suspicious.get('strings', [])),
+        'icon_similarity': static_result.icon_similarity_score,
+        'ip_count': static_result.suspicious.get('ip_count', 0),
+        'url_count': static_result.suspicious.get('url_count', 0),
+        'dangerous_permissions': len(static_result.dangerous_permissions),
+        'cert_trusted_match': int(static_result.cert_trusted_match),
+        'perm_dangerous_count': len(static_result.dangerous_permissions),
+        'perm_normal_count': len(static_result.permissions) - len(static_result.dangerous_permissions),
+        'perm_custom_count': 0
+    }
+
+    # Scale features (row ordered to match the bundle's feature list)
+    X = np.array([[feature_values[f] for f in features]], dtype=np.float64)
+    X_scaled = scaler.transform(X)
+
+    # ML prediction
+    ml_prob = clf.predict_proba(X_scaled)[0][1]
+    return ml_prob, X_scaled
+
+
+def explain_prediction(X_scaled):
+    # check_additivity=False skips SHAP's verification predict pass; the
+    # tree_path_dependent fast mode is TreeExplainer's default.
+    shap_vals = explainer.shap_values(X_scaled, check_additivity=False)
+    shap_for_class1 = shap_vals[1] if isinstance(shap_vals, list) else shap_vals
+    shap_values_sample = shap_for_class1[0].flatten()
+    return [
+        f"High {feat} contributes to fake prediction"
+        for i, feat in enumerate(features) if shap_values_sample[i] > 0
+    ]
+
 
 def combine_ml_vt_mb(ml_prob, vt_detections, vt_total, mb_detections):
     vt_score = (vt_detections/vt_total) if vt_total>0 else 0
@@ -89,55 +158,47 @@ def analyze():
 
     filename = secure_filename(file.filename)
     filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(filepath)
+    sha256 = save_and_hash(file, filepath)
 
     try:
         # ------------------------
         # Static Analysis
         # ------------------------
-        static_result = analyze_apk(filepath, trusted_data_path=TRUSTED_DATA_FILE)
-
-        # VirusTotal lookup
-        sha256 = static_result.sha256
-        vt_result = vt_lookup_sha256(sha256)
-        static_result.vt = vt_result
+        # The hash is already known from the upload stream, so the network
+        # lookups run while the CPU does the static analysis.
+        vt_future = lookup_pool.submit(vt_lookup_sha256, sha256)
+        mb_future = lookup_pool.submit(malwarebazaar_lookup_sha256, sha256, MB_API_KEY)
 
+        static_result = analysis_pool.submit(
+            analyze_apk, filepath, trusted_data_path=TRUSTED_DATA_FILE, sha256=sha256
+        ).result()
 
-        mb_api_key = "27d581095c588795cc923982eda9b787ceb6ab2af6fdb7ab"  
-        mb_result = malwarebazaar_lookup_sha256(sha256, api_key=mb_api_key)
+        vt_result = vt_future.result()
+        static_result.vt = vt_result
+        mb_result = mb_future.result()
 
         # ------------------------
         # Prepare ML features
         # ------------------------
-        df_features = pd.DataFrame([{
-            'permissions_score': len(static_result.permissions),
-            'entropy': static_result.entropy_classes_dex,
-            'cert_mismatch': 0 if static_result.cert_trusted_match else 1,
-            'suspicious_strings': len(static_result.suspicious.get('strings', [])),
-            'icon_similarity': static_result.icon_similarity_score,
-            'ip_count': static_result.suspicious.get('ip_count', 0),
-            'url_count': static_result.suspicious.get('url_count', 0),
-            'dangerous_permissions': len(static_result.dangerous_permissions),
-            'cert_trusted_match': int(static_result.cert_trusted_match),
-            'perm_dangerous_count': len(static_result.dangerous_permissions),
-            'perm_normal_count': len(static_result.permissions) - len(static_result.dangerous_permissions),
-            'perm_custom_count': 0
-        }])
-
-        # Scale features
-        X_scaled = scaler.transform(df_features[features])
-
-        # ML prediction
-        ml_prob = clf.predict_proba(X_scaled)[0][1]
-
-        # SHAP explanations
-        shap_vals = explainer.shap_values(X_scaled)
-        shap_for_class1 = shap_vals[1] if isinstance(shap_vals, list) else shap_vals
-        shap_values_sample = shap_for_class1[0].flatten()
-        explanations = [
-            f"High {feat} contributes to fake prediction"
-            for i, feat in enumerate(features) if shap_values_sample[i] > 0
-        ]
+        trusted_mtime = os.path.getmtime(TRUSTED_DATA_FILE) if os.path.exists(TRUSTED_DATA_FILE) else None
+        cache_key = (sha256, trusted_mtime)
+        entry = ml_cache.get(cache_key)
+        if entry is not None:
+            ml_cache.move_to_end(cache_key)
+        else:
+            ml_prob, X_scaled = run_ml(static_result)
+            entry = {'ml_prob': ml_prob, 'X_scaled': X_scaled, 'explanations': None}
+            ml_cache[cache_key] = entry
+            if len(ml_cache) > ML_CACHE_MAX:
+                ml_cache.popitem(last=False)
+        ml_prob = entry['ml_prob']
+
+        # SHAP is an order of magnitude slower than the prediction itself;
+        # confident predictions (clearly safe or clearly malicious) skip it
+        # and only the ambiguous band pays for an explanation.
+        if entry['explanations'] is None and 0.3 < ml_prob < 0.7:
+            entry['explanations'] = explain_prediction(entry['X_scaled'])
+        explanations = entry['explanations'] or []
 
         # ------------------------
         # Combine ML + VT + MalwareBazaar